@@ -100,6 +100,18 @@ print(f"Searching best match for Nolli names:")
 
 # print(f"MATCHED {counter} NOLLI ENTRIES")
 
+# TIP: Printing a line for every entry slows down long runs and does not tell how long is left.
+#      Replace the print with a `ProgressReporter` (from utils.py), which shows the entries
+#      per second and the time left, updated at most once a second:
+#
+# progress = ProgressReporter(len(nolli_relevant_data))
+# for nolli_id, values in nolli_relevant_data.items():
+#     ...
+#     progress.update(entries=1)
+# progress.close()
+#
+#      `match_all(nolli_relevant_data, osm_features, ..., progress=True)` does the same for the whole batch.
+
 ###############################
 # 6) Save results as JSON and GeoJSON
 ###############################
@@ -0,0 +1,283 @@
+"""
+Benchmarks the matching hot paths on synthetic, city-scale data.
+
+The data is generated with realistic Italian place names and mixed geometries around
+Rome: OSM-like features (points, streets and building outlines) and Nolli-like points
+whose names are altered copies of some of the OSM names. Each benchmark is timed a few
+times and the best run is kept; the results are printed and saved as JSON, and a
+previous results file can be given to compare the two runs.
+
+Usage:
+    python benchmark.py --sizes 1000,10000,100000 --output benchmark_results.json
+    python benchmark.py --sizes 1000000 --only find_closest_matches --compare benchmark_results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from utils import (load_data, find_best_matches, match_all, find_closest_matches, compute_centroids, NameIndex,
+                   save_to_geojson)
+
+# Building blocks of the synthetic names
+STREET_TYPES = ("Via", "Vicolo", "Piazza", "Largo", "Viale", "Lungotevere", "Salita", "Vicolo del")
+BUILDING_TYPES = ("Chiesa di", "Palazzo", "Basilica di", "Oratorio di", "Collegio", "Fontana di", "Monastero di")
+SAINTS = ("San Pietro", "Santa Maria", "Sant'Agnese", "San Lorenzo", "Santo Stefano", "San Giovanni", "Sant'Andrea",
+          "Santa Cecilia", "San Carlo", "Santa Caterina", "San Salvatore", "Sant'Eustachio", "San Nicola", "Santa Lucia")
+FAMILIES = ("Farnese", "Barberini", "Colonna", "Orsini", "Borghese", "Doria Pamphilj", "Chigi", "Altemps", "Spada",
+            "Corsini", "Massimo", "Odescalchi", "Caetani", "Ruspoli", "Savelli", "Mattei", "Giustiniani", "Cenci")
+QUALIFIERS = ("della Scala", "in Trastevere", "dei Fiorentini", "al Corso", "in Monte", "della Pace", "ai Monti",
+              "in Campo", "de' Cerchi", "della Valle", "sopra Minerva", "in Aquiro", "dei Genovesi", "alle Terme")
+ABBREVIATIONS = (("Santa ", "S. "), ("San ", "S. "), ("Santo ", "S. "), ("Sant'", "S. "), ("Palazzo ", "Pal. "))
+
+# Area covered by the features: the centre of Rome
+LON_RANGE = (12.44, 12.52)
+LAT_RANGE = (41.87, 41.93)
+
+BENCHMARKS = ("load_data", "find_best_matches", "match_all", "find_closest_matches", "save_to_geojson")
+
+
+def synthetic_name(rng):
+    """
+    Returns a random Italian place name, e.g. "Chiesa di Santa Maria della Scala" or "Vicolo Farnese".
+    """
+    kind = rng.random()
+    if kind < 0.45:
+        name = f"{STREET_TYPES[rng.integers(len(STREET_TYPES))]} {FAMILIES[rng.integers(len(FAMILIES))]}"
+    elif kind < 0.8:
+        name = f"{BUILDING_TYPES[rng.integers(len(BUILDING_TYPES))]} {SAINTS[rng.integers(len(SAINTS))]}"
+    else:
+        name = f"Palazzo {FAMILIES[rng.integers(len(FAMILIES))]}"
+    if rng.random() < 0.5:
+        name += " " + QUALIFIERS[rng.integers(len(QUALIFIERS))]
+    return name
+
+
+def historic_variant(name, rng):
+    """
+    Alters a name the way the Nolli map spells it: abbreviations, old spellings and typos.
+    """
+    for full, short in ABBREVIATIONS:
+        if full in name and rng.random() < 0.5:
+            name = name.replace(full, short, 1)
+    if rng.random() < 0.3:
+        name = name.replace("Chiesa di ", "").replace("Pamphilj", "Panfili").replace("Giovanni", "Gio.")
+    if rng.random() < 0.3 and len(name) > 4:
+        position = int(rng.integers(1, len(name) - 1))
+        name = name[:position] + name[position + 1:]  # A dropped letter
+    return name
+
+
+def random_point(rng):
+    return [round(float(rng.uniform(*LON_RANGE)), 7), round(float(rng.uniform(*LAT_RANGE)), 7)]
+
+
+def synthetic_osm_features(n, seed=0):
+    """
+    Generates `n` OSM-like features: 60% points, 25% streets (LineString) and 15% buildings (Polygon).
+    """
+    rng = np.random.default_rng(seed)
+    features = []
+    for osm_id in range(n):
+        start = random_point(rng)
+        kind = rng.random()
+        if kind < 0.6:
+            geometry = {"type": "Point", "coordinates": start}
+        elif kind < 0.85:
+            steps = rng.normal(scale=0.0005, size=(int(rng.integers(2, 8)), 2)).cumsum(axis=0)
+            geometry = {"type": "LineString",
+                        "coordinates": [start] + [[start[0] + dx, start[1] + dy] for dx, dy in steps.tolist()]}
+        else:
+            width, height = rng.uniform(0.0001, 0.001, size=2).tolist()
+            lon, lat = start
+            ring = [[lon, lat], [lon + width, lat], [lon + width, lat + height], [lon, lat + height], [lon, lat]]
+            geometry = {"type": "Polygon", "coordinates": [ring]}
+        properties = {"@id": f"way/{osm_id}"}
+        if rng.random() < 0.8:  # Not every OSM feature has a name
+            properties["name"] = synthetic_name(rng)
+        features.append({"type": "Feature", "properties": properties, "geometry": geometry})
+    return features
+
+
+def synthetic_nolli_features(n, osm_features, seed=1):
+    """
+    Generates `n` Nolli-like points; about half of them are historic variants of an OSM name, placed near it.
+    """
+    rng = np.random.default_rng(seed)
+    named = [feature for feature in osm_features if "name" in feature["properties"]]
+    features = []
+    for number in range(1, n + 1):
+        if named and rng.random() < 0.5:
+            osm_feature = named[int(rng.integers(len(named)))]
+            modern_name = osm_feature["properties"]["name"]
+            coordinates = osm_feature["geometry"]["coordinates"]
+            while isinstance(coordinates[0], list):
+                coordinates = coordinates[0]
+            coordinates = [coordinates[0] + float(rng.normal(scale=0.0002)), coordinates[1] + float(rng.normal(scale=0.0002))]
+        else:
+            modern_name = synthetic_name(rng)
+            coordinates = random_point(rng)
+        properties = {
+            "Nolli Number": str(number),
+            "Nolli Name": historic_variant(modern_name, rng),
+            "Unravelled Name": historic_variant(modern_name, rng),
+            "Modern Name": modern_name if rng.random() < 0.7 else "n/a",
+        }
+        features.append({"type": "Feature", "properties": properties,
+                         "geometry": {"type": "Point", "coordinates": coordinates}})
+    return features
+
+
+def nolli_entries(nolli_features):
+    """
+    Extracts the {nolli_id: {"nolli_names": [...], "nolli_coords": geometry}} entries matched by `match_all()`.
+    """
+    return {
+        feature["properties"]["Nolli Number"]: {
+            "nolli_names": [feature["properties"][field] for field in ("Nolli Name", "Unravelled Name", "Modern Name")],
+            "nolli_coords": feature["geometry"],
+        }
+        for feature in nolli_features
+    }
+
+
+def measure(function, repeat):
+    """
+    Runs `function` `repeat` times with its output silenced and returns the best wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(size, only=None, repeat=3, queries=20, workdir="."):
+    """
+    Runs the benchmarks on `size` OSM features (and a tenth as many Nolli entries).
+
+    Returns:
+    list: One dict per benchmark, with its name, variant, size, number of items and best time.
+    """
+    osm_features = synthetic_osm_features(size)
+    nolli_features = synthetic_nolli_features(max(size // 10, 10), osm_features)
+    nolli_relevant_data = nolli_entries(nolli_features)
+    results = []
+
+    def record(name, variant, items, seconds):
+        results.append({"benchmark": name, "variant": variant, "size": size, "items": items, "seconds": seconds,
+                        "items_per_second": items / seconds if seconds else None})
+        print(f"{name:<22} {variant:<12} {size:>9} {items:>9} {seconds:>10.4f} s")
+
+    if only is None or "load_data" in only:
+        path = os.path.join(workdir, f"osm_{size}.geojson")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"type": "FeatureCollection", "features": osm_features}, file)
+        record("load_data", "file", size, measure(lambda: load_data(path), repeat))
+        os.remove(path)
+
+    if only is None or "find_best_matches" in only:
+        # One call per Nolli entry: each call scans every OSM name
+        search_names = [values["nolli_names"] for values in list(nolli_relevant_data.values())[:queries]]
+        record("find_best_matches", "scan", len(search_names), measure(
+            lambda: [find_best_matches(names, osm_features, threshold=85) for names in search_names], repeat))
+        index = NameIndex(osm_features)
+        record("find_best_matches", "name_index", len(search_names), measure(
+            lambda: [find_best_matches(names, osm_features, threshold=85, index=index) for names in search_names], repeat))
+
+    if only is None or "match_all" in only:
+        record("match_all", "serial", len(nolli_relevant_data), measure(
+            lambda: match_all(nolli_relevant_data, osm_features, threshold=85), repeat))
+
+    if only is None or "find_closest_matches" in only:
+        centroids = compute_centroids(osm_features)
+        for variant, options in (("geodesic", {"use_geodesic": True}), ("euclidean", {"use_geodesic": False}),
+                                 ("geometry", {"use_geodesic": True, "use_geometry": True})):
+            record("find_closest_matches", variant, len(nolli_features), measure(
+                lambda: find_closest_matches(nolli_features, osm_features, dataset_2_centroids=centroids, **options),
+                repeat))
+
+    if only is None or "save_to_geojson" in only:
+        # Synthetic matches for half of the entries, to avoid running the matching again
+        rng = np.random.default_rng(2)
+        for values in nolli_relevant_data.values():
+            osm_feature = osm_features[int(rng.integers(len(osm_features)))]
+            values["match"] = (values["nolli_names"][0], osm_feature["properties"].get("name", ""), 90,
+                               {"osm_coords": osm_feature["geometry"]["coordinates"]}) if rng.random() < 0.5 else None
+        path = os.path.join(workdir, f"matched_{size}.geojson")
+        record("save_to_geojson", "file", len(nolli_relevant_data), measure(
+            lambda: save_to_geojson(nolli_relevant_data, path), repeat))
+        os.remove(path)
+
+    return results
+
+
+def environment():
+    """
+    Describes the machine and the code the benchmarks ran on.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor(),
+            "cpu_count": os.cpu_count(), "commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, previous_results):
+    """
+    Prints the change in time of every benchmark also found in a previous results file.
+    """
+    previous = {(result["benchmark"], result["variant"], result["size"]): result["seconds"]
+                for result in previous_results["results"]}
+    print(f"\nCompared with {previous_results['environment'].get('commit')}:")
+    for result in results:
+        before = previous.get((result["benchmark"], result["variant"], result["size"]))
+        if before:
+            change = (result["seconds"] - before) / before * 100
+            print(f"{result['benchmark']:<22} {result['variant']:<12} {result['size']:>9} {change:>+9.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the matching functions on synthetic data.")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated numbers of OSM features (Nolli entries are a tenth of them)")
+    parser.add_argument("--only", default=None, help="comma-separated benchmarks to run, among: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each benchmark; the best one is kept")
+    parser.add_argument("--queries", type=int, default=20, help="Nolli entries looked up with find_best_matches")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the results are saved to")
+    parser.add_argument("--compare", default=None, help="previous results file to compare with")
+    args = parser.parse_args(argv)
+
+    only = set(args.only.split(",")) if args.only else None
+    if only is not None and not only <= set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(only - set(BENCHMARKS)))}")
+    previous_results = load_data(args.compare) if args.compare else None
+
+    print(f"{'benchmark':<22} {'variant':<12} {'size':>9} {'items':>9} {'best time':>12}")
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(size) for size in args.sizes.split(",")):
+            results += run_benchmarks(size, only=only, repeat=args.repeat, queries=args.queries, workdir=workdir)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if previous_results is not None:
+        compare(results, previous_results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
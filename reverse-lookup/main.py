@@ -1,4 +1,4 @@
-from utils import extract_files, load_data, save_to_json, print_dict, find_closest_matches, convert_to_geojson
+from utils import extract_files, load_data, save_to_json, print_dict, find_closest_matches, convert_to_geojson, partition_matches
 
 ###############################
 # 1) Define the input files
@@ -61,6 +61,11 @@ from utils import extract_files, load_data, save_to_json, print_dict, find_close
 #    If `Nolli_ID` is NOT in `matched_ids`, append to `non_matched_data`
 
 # NOTE: Use the `if not value in list:` syntax to check if an ID is in a list.
+#
+# TIP: Checking a list is slow on large files, as the whole list is scanned for every ID
+#      (a `set` is much faster). Once your version works, compare it with
+#      `matched_data, non_matched_data, index = partition_matches(geojson_data)`,
+#      which does steps 3 and 4 in a single pass.
 
 ###############################
 # 5) Load OSM features from the ZIP file
@@ -90,7 +95,8 @@ from utils import extract_files, load_data, save_to_json, print_dict, find_close
 #
 #       Luckily, you don't have to deal with it, because we created the function
 #       `find_closest_matches`. Go to utils.py and find out how to use it!
-#       Keep the use_geodesic flag to False, otherwise it will take too much time.
+#       The default use_geodesic=True measures real distances in meters and is fast:
+#       the exact geodesic distance is only computed for the nearest candidates.
 #
 
 # matches = find_closest_matches(...)
@@ -0,0 +1,199 @@
+"""
+Runs the whole matching workflow in a single process:
+
+    extract -> load -> fuzzy match -> proximity match of the leftovers -> export
+
+This is `gottamatch-emall/main.py` followed by `reverse-lookup/main.py`, without the
+intermediate files: the ZIP archive is read once, and the parsed datasets and the
+spatial index stay in memory from one stage to the next. The wall time and the peak
+memory of every stage are printed at the end.
+
+Usage:
+    python pipeline.py [--workers 4] [--max-distance 200] [--parquet] [--trace-memory]
+"""
+import argparse
+import contextlib
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource  # Peak RSS of the process (not available on Windows)
+except ImportError:
+    resource = None
+
+from utils import (extract_files, load_data, iter_features, FeatureStore, MatchCache, SpatialIndex, compute_centroids,
+                   match_all, find_closest_matches, save_to_json, save_to_geojson, save_to_parquet, convert_to_geojson)
+
+
+class StageTimer:
+    """
+    Measures the wall time and the peak memory of each stage of the pipeline.
+
+    By default the peak memory is the resident set size of the process so far (it only grows).
+    With `trace_memory`, `tracemalloc` measures the peak of the memory allocated by Python within
+    each stage instead, which is more precise but slows the run down.
+
+    Parameters:
+    trace_memory (bool): Measure the per-stage peak with `tracemalloc` (default: False).
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        if trace_memory:
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        print(f"==> {name}")
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else _peak_rss()
+            self.stages.append((name, elapsed, peak))
+
+    def report(self):
+        label = "peak traced" if self.trace_memory else "peak RSS"
+        print(f"\n{'stage':<12} {'time (s)':>10} {label + ' (MB)':>18}")
+        for name, elapsed, peak in self.stages:
+            memory = f"{peak / 2**20:.1f}" if peak is not None else "n/a"
+            print(f"{name:<12} {elapsed:>10.2f} {memory:>18}")
+        print(f"{'total':<12} {sum(elapsed for _, elapsed, _ in self.stages):>10.2f}")
+
+
+def _peak_rss():
+    """
+    Returns the peak resident set size of the process in bytes, or None if unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Kilobytes on Linux
+
+
+def nolli_entries(nolli_data):
+    """
+    Extracts {nolli_id: {"nolli_names": [...], "nolli_coords": geometry}} from the Nolli features.
+    """
+    nolli_relevant_data = {}
+    for feature in nolli_data["features"]:
+        properties = feature.get("properties", {})
+        nolli_relevant_data[properties.get("Nolli Number", "")] = {
+            "nolli_names": [
+                properties.get("Nolli Name", ""),
+                properties.get("Unravelled Name", ""),
+                properties.get("Modern Name", "")
+            ],
+            "nolli_coords": feature.get("geometry", {})
+        }
+    return nolli_relevant_data
+
+
+def unmatched_features(nolli_relevant_data):
+    """
+    Returns the Nolli points without a fuzzy match, as `save_to_geojson()` writes them.
+    """
+    features = []
+    for nolli_id, values in nolli_relevant_data.items():
+        match = values.get("match")
+        if match is not None and match[-1].get("osm_coords"):
+            continue
+        geometry = values.get("nolli_coords")
+        if not geometry or "coordinates" not in geometry:
+            continue
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "Nolli_ID": nolli_id,
+                "Nolli_Name": values["nolli_names"][0],
+                "Marker_Type": "Nolli",
+            },
+            "geometry": {"type": "Point", "coordinates": geometry["coordinates"]}
+        })
+    return features
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzzy match the Nolli map entries to OSM features, "
+                                                 "then match the leftovers by distance.")
+    parser.add_argument("--zip", default="../gottamatch-emall/geojson_data.zip", help="ZIP archive with the GeoJSON data")
+    parser.add_argument("--extract", action="store_true", help="also extract the GeoJSON files from the ZIP archive to disk")
+    parser.add_argument("--threshold", type=int, default=85, help="minimum fuzzy matching score")
+    parser.add_argument("--scorer", default="ratio", help="fuzzy matching function, e.g. ratio or partial_ratio")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes used for the fuzzy matching")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every match instead of reusing match_cache.sqlite")
+    parser.add_argument("--save-index", action="store_true",
+                        help="reuse the spatial index of the OSM features saved next to the ZIP archive, saving it if needed")
+    parser.add_argument("--max-distance", type=float, default=None,
+                        help="leave the Nolli entries without an OSM feature within this many meters unmatched")
+    parser.add_argument("--parquet", action="store_true", help="also save the results as GeoParquet tables (requires pyarrow)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure the peak memory of each stage with tracemalloc (slower)")
+    args = parser.parse_args(argv)
+
+    geojson_files = ["nolli_points_open.geojson", "osm_node_way_relation.geojson"]
+    osm_source = (args.zip, geojson_files[1])
+    timer = StageTimer(trace_memory=args.trace_memory)
+
+    # The members are read straight from the archive: extracting them is only needed to inspect them by hand
+    if args.extract:
+        with timer.stage("extract"):
+            extract_files(args.zip, geojson_files)
+
+    with timer.stage("load"):
+        nolli_relevant_data = nolli_entries(load_data(args.zip, member=geojson_files[0]))
+        osm_features = FeatureStore(iter_features(osm_source))
+        print(f"{len(nolli_relevant_data)} Nolli entries, {len(osm_features)} OSM features")
+
+    with timer.stage("fuzzy"):
+        cache = None if args.no_cache else MatchCache("match_cache.sqlite")
+        matches = match_all(nolli_relevant_data, osm_features, key_field="name", threshold=args.threshold,
+                            scorer=args.scorer, workers=args.workers, cache=cache, progress=True)
+        if cache is not None:
+            cache.close()
+        for nolli_id, match in matches.items():
+            nolli_relevant_data[nolli_id]["match"] = match
+        print(f"MATCHED {sum(match is not None for match in matches.values())} NOLLI ENTRIES")
+
+    with timer.stage("index"):
+        index = None
+        if args.save_index:
+            fingerprint = SpatialIndex.source_fingerprint(osm_source)
+            index_path = SpatialIndex.default_path(osm_source)
+            index = SpatialIndex.load(index_path, fingerprint)
+        if index is None:
+            # Built from the features already in memory instead of reading the archive again
+            index = SpatialIndex(compute_centroids(osm_features))
+            if args.save_index:
+                index.fingerprint = fingerprint
+                index.save(index_path)
+
+    with timer.stage("proximity"):
+        non_matched_data = unmatched_features(nolli_relevant_data)
+        geographic_matches = []
+        # Nothing to match when every entry got a fuzzy match (`find_closest_matches()` needs both datasets)
+        if non_matched_data and len(osm_features):
+            geographic_matches = find_closest_matches(non_matched_data, osm_features, index=index,
+                                                      max_distance=args.max_distance)
+        print(f"MATCHED {sum(match[1] is not None for match in geographic_matches)} "
+              f"OF {len(non_matched_data)} LEFTOVER ENTRIES BY DISTANCE")
+
+    with timer.stage("export"):
+        save_to_json(nolli_relevant_data, "matched_nolli_features.json")
+        save_to_geojson(nolli_relevant_data, "matched_nolli_features.geojson")
+        save_to_json(geographic_matches, "nolli_geographic_match.json")
+        convert_to_geojson(geographic_matches, "nolli_geographic_match.geojson")
+        if args.parquet:
+            save_to_parquet(nolli_relevant_data, "matched_nolli_features.parquet")
+            save_to_parquet(geographic_matches, "nolli_geographic_match.parquet")
+
+    timer.report()
+
+
+if __name__ == "__main__":
+    main()